@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Benchmark for parallel lexing: generates a large LOLCODE program and times
+# tokenize_file() with 1..N worker processes.
+#
+#   python bench_parallel_lex.py --size-mb 500 --max-workers 16
+#
+# The whole token list is kept in memory, so a 500 MB program needs a machine
+# with plenty of RAM.
+import argparse
+import os
+import tempfile
+import time
+
+from lolcode_interpreter import tokenize_file
+
+PROGRAM_BODY = (
+    'I HAS A x ITZ 5\n'
+    'x R SUM OF x AN 2.5\n'
+    'VISIBLE "hello"\n'
+    'BOTH SAEM x AN WIN\n'
+    'O RLY?\n'
+    'YA RLY\n'
+    'VISIBLE PRODUKT OF x AN 3\n'
+    'NO WAI\n'
+    'VISIBLE "nope"\n'
+    'OIC\n'
+)
+
+def generate_program(path, size_mb):
+    target = size_mb * 1024 * 1024
+    block = PROGRAM_BODY * 1000
+    written = 0
+    with open(path, "w") as f:
+        f.write("HAI\n")
+        while written < target:
+            f.write(block)
+            written += len(block)
+        f.write("KTHXBYE\n")
+
+def worker_counts(max_workers):
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+def main():
+    argparser = argparse.ArgumentParser(description="Benchmark parallel LOLCODE lexing.")
+    argparser.add_argument("--size-mb", type=int, default=500, help="size of the generated program")
+    argparser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                           help="largest worker count to time")
+    argparser.add_argument("--file", help="lex this file instead of generating one")
+    args = argparser.parse_args()
+
+    path = args.file
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".lol")
+        os.close(fd)
+        print(f"Generating {args.size_mb} MB program in {path} ...")
+        generate_program(path, args.size_mb)
+
+    try:
+        baseline = None
+        print(f"{'workers':>7}  {'tokens':>12}  {'seconds':>9}  {'speedup':>7}")
+        for workers in worker_counts(args.max_workers):
+            start = time.perf_counter()
+            count = len(tokenize_file(path, workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>7}  {count:>12}  {elapsed:>9.2f}  {baseline / elapsed:>6.2f}x")
+    finally:
+        if args.file is None:
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
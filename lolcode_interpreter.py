@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
 import sys
 import re
+import os
+import mmap
+import locale
+import argparse
+import itertools
+import collections
+from concurrent.futures import ProcessPoolExecutor
 
 # ------------------------------
 # Tokenization
@@ -122,6 +129,104 @@ class Lexer:
             raise Exception(f"Unrecognized token at line {lnum}, col {pos+1}")
         return tokens
 
+# ------------------------------
+# Parallel tokenization
+# ------------------------------
+
+# Each line is lexed independently of every other line, so a large source
+# file can be cut into line-aligned byte ranges and lexed in worker processes.
+# Chunks always end right after a b"\n", which keeps CRLF pairs and UTF-8
+# sequences intact and makes splitlines() of the whole text equal to the
+# concatenation of splitlines() of every chunk.
+
+def _chunk_bounds(mm, size, chunk_size):
+    bounds = []
+    start = 0
+    while start < size:
+        end = mm.find(b"\n", min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+def _read_chunk(path, start, end, encoding):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                return mm[start:end].decode(encoding)
+            except UnicodeDecodeError as err:
+                # Report the byte position within the whole file, not the chunk.
+                raise UnicodeDecodeError(err.encoding, mm[:end], start + err.start,
+                                         start + err.end, err.reason) from None
+
+def _count_chunk_lines(job):
+    path, start, end, encoding = job
+    return len(_read_chunk(path, start, end, encoding).splitlines())
+
+def _tokenize_chunk(job):
+    # Lex one byte range with final line numbers, so a bad token raises the
+    # same error here as it would in Lexer.tokenize().
+    path, start, end, encoding, line_offset = job
+    text = _read_chunk(path, start, end, encoding)
+    lexer = Lexer(text)
+    tokens = []
+    for lnum, line in enumerate(text.splitlines(), start=line_offset + 1):
+        tokens.extend(lexer.tokenize_line(line, lnum))
+    return tokens
+
+def _map_in_order(pool, fn, jobs, window):
+    # Yield results in file order while keeping only `window` chunks in
+    # flight, so an error near the start of the file only has to wait for
+    # those chunks, not the rest of the file.
+    jobs = iter(jobs)
+    pending = collections.deque(pool.submit(fn, job) for job in itertools.islice(jobs, window))
+    while pending:
+        result = pending.popleft().result()
+        for job in itertools.islice(jobs, 1):
+            pending.append(pool.submit(fn, job))
+        yield result
+
+def tokenize_file(path, workers=None, encoding=None, chunk_size=64 * 1024):
+    """Tokenize a source file across worker processes.
+
+    Produces the same tokens, and raises the same error for the first bad
+    token, as Lexer(text).tokenize() on the file's contents. A file that
+    can't be read or decoded raises OSError or UnicodeError before any
+    lexing error is reported.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        with open(path, "r", encoding=encoding) as f:
+            return Lexer(f.read()).tokenize()
+
+    encoding = encoding or locale.getpreferredencoding(False)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = _chunk_bounds(mm, size, chunk_size)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # First pass: decode every chunk and count its lines. This surfaces
+        # decode errors anywhere in the file before lexing starts, and gives
+        # each chunk its starting line number.
+        jobs = [(path, start, end, encoding) for start, end in bounds]
+        offsets = [0]
+        for count in _map_in_order(pool, _count_chunk_lines, jobs, workers * 2):
+            offsets.append(offsets[-1] + count)
+
+        jobs = [(path, start, end, encoding, offset) for (start, end), offset in zip(bounds, offsets)]
+        tokens = []
+        for chunk_tokens in _map_in_order(pool, _tokenize_chunk, jobs, workers * 2):
+            tokens.extend(chunk_tokens)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return tokens
+
 # ------------------------------
 # Parsing (AST Construction)
 # ------------------------------
@@ -422,24 +527,43 @@ def format_value(val):
 # Main entry point
 # ------------------------------
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python lolcode_interpreter.py <filename.lol>")
-        sys.exit(1)
-    filename = sys.argv[1]
+def _job_count(value):
     try:
-        with open(filename, "r") as f:
-            code = f.read()
-    except Exception as err:
-        print("Error reading file:", err)
-        sys.exit(1)
-    
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"job count must be a positive integer, got '{value}'")
+    return jobs
+
+def main():
+    argparser = argparse.ArgumentParser(description="Run a LOLCODE program.")
+    argparser.add_argument("filename", help="the .lol file to run")
+    argparser.add_argument("-j", "--jobs", type=_job_count, default=None,
+                           help="lex the file in parallel across N worker processes")
+    args = argparser.parse_args()
+
+    if args.jobs is None:
+        try:
+            with open(args.filename, "r") as f:
+                code = f.read()
+        except Exception as err:
+            print("Error reading file:", err)
+            sys.exit(1)
+
     try:
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
+        if args.jobs is None:
+            lexer = Lexer(code)
+            tokens = lexer.tokenize()
+        else:
+            tokens = tokenize_file(args.filename, args.jobs)
         # Uncomment the following line to see all tokens during debugging.
         # for tok in tokens:
         #     print(tok)
+    except (OSError, UnicodeError) as err:
+        # Only tokenize_file reads the file here.
+        print("Error reading file:", err)
+        sys.exit(1)
     except Exception as err:
         print("Lexing Error:", err)
         sys.exit(1)